@@ -0,0 +1,36 @@
+"""
+Backtest Kernel Layouts
+
+Array layouts shared by the backtest kernels and their callers. Kept free of
+numba so the AOT-compiled path never imports it.
+"""
+
+import numpy as np
+
+# Layout of the kernel's carried state array
+STATE_POSITION = 0
+STATE_ENTRY_PX = 1
+STATE_REALIZED = 2
+STATE_N_TRADES = 3
+STATE_SIZE = 4
+
+
+def allocate_trades(n_ticks: int):
+    """
+    Allocate the trade log arrays filled by ``_simulate``
+
+    Every trade spans at least two ticks, so ``n_ticks // 2 + 1`` rows hold
+    all closed trades plus one open entry.
+
+    Returns:
+        Tuple of (entry_ts, exit_ts, side, entry_px, exit_px, pnl)
+    """
+    n = n_ticks // 2 + 1
+    return (
+        np.empty(n, dtype=np.int64),
+        np.empty(n, dtype=np.int64),
+        np.empty(n, dtype=np.float64),
+        np.empty(n, dtype=np.float64),
+        np.empty(n, dtype=np.float64),
+        np.empty(n, dtype=np.float64),
+    )
@@ -0,0 +1,131 @@
+"""
+Backtest Inner Loop
+
+Tick-by-tick simulation kernel compiled with Numba. All inputs are flat numpy
+arrays (structure-of-arrays) so the loop lowers to native code.
+"""
+
+import numpy as np
+
+from ._bt_layout import STATE_ENTRY_PX, STATE_N_TRADES, STATE_POSITION, STATE_REALIZED
+from ._njit import KERNEL_OPTIONS, njit
+
+# Explicit signatures compile (or load from cache) at import rather than on the
+# first call, and are shared by the AOT build (build_aot.py). Arrays are
+# declared C-contiguous ([::1]) so loads are unit-stride and vectorizable;
+# load_quotes and allocate_trades always produce contiguous arrays.
+SIMULATE_SIGNATURE = (
+    "Tuple((i8, f8[::1]))"
+    "(i8[::1], f8[::1], f8[::1], f8[::1], f8, f8, f8, f8[::1],"
+    " i8[::1], i8[::1], f8[::1], f8[::1], f8[::1], f8[::1])"
+)
+MAX_DRAWDOWN_SIGNATURE = "f8(f8[::1])"
+
+
+@njit(SIMULATE_SIGNATURE, **KERNEL_OPTIONS)
+def _simulate(ts, bid, ask, sig, stop, tp, cost, state,
+              trade_entry_ts, trade_exit_ts, trade_side, trade_entry_px, trade_exit_px, trade_pnl):
+    """
+    Simulate a single-unit position over a quote stream
+
+    A flat position enters on a non-zero signal (+1 buys at the ask, -1 sells
+    at the bid) and exits when the return since entry hits the stop loss or
+    take profit. The position is marked to the exit side of the book.
+
+    The open position is carried in ``state`` so a long stream can be
+    simulated chunk by chunk with results identical to a single call.
+
+    Args:
+        ts: Quote timestamps (int64, ns since epoch)
+        bid: Best bid prices (float64)
+        ask: Best ask prices (float64)
+        sig: Entry signal per tick (float64; +1 long, -1 short, 0 none)
+        stop: Stop loss as a fraction of the entry price
+        tp: Take profit as a fraction of the entry price
+        cost: Commission plus slippage as a fraction of each fill's notional
+        state: float64[STATE_SIZE] carried between calls, updated in place;
+            start from zeros
+        trade_*: Trade log arrays from ``allocate_trades``, filled in
+            place. Rows below the returned count are closed trades;
+            ``trade_pnl`` is net of costs.
+
+    Returns:
+        Tuple of (n_trades, equity):
+        n_trades - closed trades in the trade log so far
+        equity - cumulative net PnL per unit of position at every tick
+    """
+    n = ts.shape[0]
+    equity = np.empty(n, dtype=np.float64)
+
+    pos = state[STATE_POSITION]
+    entry_px = state[STATE_ENTRY_PX]
+    realized = state[STATE_REALIZED]
+    k = np.int64(state[STATE_N_TRADES])
+
+    for i in range(n):
+        if pos == 0.0:
+            if sig[i] > 0.0:
+                pos = 1.0
+                entry_px = ask[i]
+            elif sig[i] < 0.0:
+                pos = -1.0
+                entry_px = bid[i]
+            if pos != 0.0:
+                realized -= entry_px * cost
+                trade_entry_ts[k] = ts[i]
+                trade_side[k] = pos
+                trade_entry_px[k] = entry_px
+        else:
+            exit_px = bid[i] if pos > 0.0 else ask[i]
+            ret = pos * (exit_px - entry_px) / entry_px
+            if ret <= -stop or ret >= tp:
+                realized += pos * (exit_px - entry_px) - exit_px * cost
+                trade_exit_ts[k] = ts[i]
+                trade_exit_px[k] = exit_px
+                trade_pnl[k] = pos * (exit_px - entry_px) - (entry_px + exit_px) * cost
+                k += 1
+                pos = 0.0
+
+        if pos > 0.0:
+            equity[i] = realized + (bid[i] - entry_px)
+        elif pos < 0.0:
+            equity[i] = realized + (entry_px - ask[i])
+        else:
+            equity[i] = realized
+
+    state[STATE_POSITION] = pos
+    state[STATE_ENTRY_PX] = entry_px
+    state[STATE_REALIZED] = realized
+    state[STATE_N_TRADES] = k
+    return k, equity
+
+
+@njit(MAX_DRAWDOWN_SIGNATURE, **KERNEL_OPTIONS)
+def _max_drawdown(equity):
+    """
+    Largest peak-to-trough decline of an equity curve, in a single pass
+
+    The loop body is branchless (running max, then max of the drawdown) so
+    LLVM can vectorize the reduction; ``fastmath`` allows the reordering.
+    Under ``fastmath`` LLVM also assumes no infinities or NaNs, so the peak
+    starts at the first value and is never used as a divisor unless
+    positive.
+
+    Args:
+        equity: Account equity at every tick (contiguous float64)
+
+    Returns:
+        Max drawdown as a fraction of the running peak (0 for an empty curve
+        and while the peak is not positive)
+    """
+    n = equity.shape[0]
+    if n == 0:
+        return 0.0
+    peak = equity[0]
+    mdd = 0.0
+    for i in range(n):
+        peak = max(peak, equity[i])
+        positive = peak > 0.0
+        denom = peak if positive else 1.0
+        mdd = max(mdd, (peak - equity[i]) / denom if positive else 0.0)
+    return mdd
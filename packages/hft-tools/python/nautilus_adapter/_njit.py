@@ -0,0 +1,54 @@
+"""
+Numba JIT Shim
+
+Re-exports ``numba.njit`` when numba is installed. Without numba the decorator
+is a no-op, so the kernels still run as plain Python (just slower).
+"""
+
+import hashlib
+import os
+
+
+def _layout_stamp() -> str:
+    """Short hash of ``_bt_layout.py``, whose constants are compiled into the kernels"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_bt_layout.py")
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+# One cache for every process (CLI calls, optimizer workers), independent of
+# where the package is installed. Must be set before numba is imported.
+# Numba only checks a kernel's own source file for staleness, so the default
+# directory is keyed by the state layout: editing _bt_layout.py must not load
+# kernels compiled (without bounds checks) against the old indices.
+os.environ.setdefault(
+    "NUMBA_CACHE_DIR",
+    os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "hft-tools", "numba",
+        f"layout-{_layout_stamp()}"),
+)
+
+# Options shared by all backtest kernels
+KERNEL_OPTIONS = {
+    "cache": True,
+    "fastmath": True,
+    "error_model": "numpy",
+    "boundscheck": False,
+}
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for ``numba.njit`` (bare or with options)"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
@@ -7,19 +7,292 @@ Input: JSON from stdin (strategy, dataConfig, config)
 Output: JSON to stdout (performance metrics, trade log)
 """
 
+import os
 import sys
-import json
-from datetime import datetime
-from decimal import Decimal
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import msgspec
+import numpy as np
+import orjson
+
+if not __package__:
+    # Executed as a script by the MCP server (no parent package). Modules are
+    # always imported by their package name so Numba's on-disk cache stays valid.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nautilus_adapter._bt_layout import STATE_SIZE, allocate_trades
+from nautilus_adapter.data import NS_PER_SECOND, format_ns, parse_period, read_quotes, simulate_quotes
+from nautilus_adapter.schemas import (
+    BacktestConfig,
+    BacktestInput,
+    BacktestResult,
+    DataConfig,
+    ExecStats,
+    MetricsByPeriod,
+    Performance,
+    Period,
+    PeriodMetrics,
+    RiskMetrics,
+    TradeLog,
+    TradeLogSummary,
+)
+
+try:
+    # Ahead-of-time compiled kernels (see build_aot.py): no JIT at startup
+    from nautilus_adapter._bt_kernels import max_drawdown as _max_drawdown, simulate as _simulate
+except ImportError:
+    from nautilus_adapter._bt_loop import _max_drawdown, _simulate
 
 # Placeholder imports - actual implementation would use NautilusTrader
 # from nautilus_trader.backtest.engine import BacktestEngine
 # from nautilus_trader.model.identifiers import TraderId
 # from nautilus_trader.model.strategies import Strategy
 
+NS_PER_DAY = 86_400 * NS_PER_SECOND
+TRADING_DAYS_PER_YEAR = 252
+
+_OPERATORS = {
+    ">": np.greater,
+    "<": np.less,
+    ">=": np.greater_equal,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+def load_quotes(data_config: DataConfig, warnings: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Load top-of-book quotes as flat numpy arrays
+
+    Reads the Parquet file at ``data_config.path`` (as written by the data
+    adapter) using ``data_config.loader`` ('mmap' or 'direct'), trimmed to
+    the requested [startDate, endDate) window. Without a path a seeded
+    random walk covering the requested period is generated instead.
+
+    Args:
+        data_config: Data configuration
+        warnings: Warning list to append to
 
-def run_backtest(strategy: Dict[str, Any], data_config: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    Returns:
+        Dict of contiguous arrays keyed by field name
+    """
+    if data_config.path:
+        start_ns, end_ns = parse_period(data_config.startDate, data_config.endDate)
+        quotes = read_quotes(data_config.path, loader=data_config.loader)
+        # Stored quotes are sorted by ts
+        lo, hi = np.searchsorted(quotes["ts"], (start_ns, end_ns))
+        quotes = {name: column[lo:hi] for name, column in quotes.items()}
+    else:
+        warnings.append("Backtest uses simulated data - results may not reflect live performance")
+        quotes = simulate_quotes(data_config.startDate, data_config.endDate)
+
+    # The kernel needs contiguous int64/float64 arrays
+    quotes["ts"] = np.ascontiguousarray(quotes["ts"], dtype=np.int64)
+    for name in ("bid", "ask", "bid_size", "ask_size"):
+        quotes[name] = np.ascontiguousarray(quotes[name], dtype=np.float64)
+    return quotes
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` ticks (expanding until the window fills)"""
+    window = max(int(window), 1)
+    csum = np.cumsum(x, dtype=np.float64)
+    out = np.empty_like(csum)
+    head = min(window, len(x))
+    out[:head] = csum[:head] / np.arange(1, head + 1)
+    out[head:] = (csum[head:] - csum[:-head]) / window
+    return out
+
+
+def _compute_signal(signal: Dict[str, Any], quotes: Dict[str, np.ndarray]):
+    """Compute a DSL signal over the quote arrays, or None if unsupported"""
+    params = signal.get("params", {})
+    signal_type = signal.get("type")
+
+    if signal_type == "order_flow_imbalance":
+        depth = quotes["bid_size"] + quotes["ask_size"]
+        imbalance = (quotes["bid_size"] - quotes["ask_size"]) / depth
+        return _rolling_mean(imbalance, params.get("windowSize", 10))
+
+    if signal_type == "volume_profile":
+        volume = quotes["bid_size"] + quotes["ask_size"]
+        return volume / _rolling_mean(volume, params.get("lookbackPeriod", 20))
+
+    if signal_type == "spread_analysis":
+        mid = 0.5 * (quotes["bid"] + quotes["ask"])
+        return (quotes["ask"] - quotes["bid"]) / mid
+
+    return None
+
+
+def build_entry_signal(strategy: Dict[str, Any], quotes: Dict[str, np.ndarray], warnings: List[str]) -> np.ndarray:
+    """
+    Evaluate the DSL entry rules into a per-tick signal array
+
+    Conditions are combined with the entry logic (AND/OR). The trade is short
+    only when every directional condition is short; otherwise it is long.
+
+    Args:
+        strategy: Strategy definition in DSL format
+        quotes: Quote arrays from ``load_quotes``
+        warnings: Warning list to append to
+
+    Returns:
+        float64 array (+1 long, -1 short, 0 no entry)
+    """
+    values = {}
+    for signal in strategy.get("signals", []):
+        value = _compute_signal(signal, quotes)
+        if value is None:
+            warnings.append(f"Signal '{signal.get('id')}' of type '{signal.get('type')}' is not supported and was ignored")
+        else:
+            values[signal.get("id")] = value
+
+    entry = strategy.get("entry", {})
+    masks = []
+    sides = set()
+    for condition in entry.get("conditions", []):
+        value = values.get(condition.get("signal"))
+        if value is None:
+            continue
+        masks.append(_OPERATORS[condition["operator"]](value, condition["value"]))
+        if condition.get("side") in ("long", "short"):
+            sides.add(condition["side"])
+
+    n = len(quotes["ts"])
+    if not masks:
+        warnings.append("No supported entry conditions - no trades were simulated")
+        return np.zeros(n, dtype=np.float64)
+
+    combine = np.logical_or if entry.get("logic", "AND") == "OR" else np.logical_and
+    mask = combine.reduce(masks)
+    direction = -1.0 if sides == {"short"} else 1.0
+    return mask.astype(np.float64) * direction
+
+
+def _safe_mean(x: np.ndarray) -> float:
+    return float(x.mean()) if x.size else 0.0
+
+
+def _safe_std(x: np.ndarray) -> float:
+    return float(x.std(ddof=1)) if x.size > 1 else 0.0
+
+
+def _period_cuts(ts: np.ndarray, period_ns: int) -> np.ndarray:
+    """
+    Offsets in ``ts`` where a new period starts, excluding the first period
+
+    ts is sorted, so each period boundary is found by binary search. The
+    cost is O(periods * log n), and no tick-length temporaries are made.
+    """
+    if ts.size == 0:
+        return np.empty(0, dtype=np.int64)
+    edges = np.arange(ts[0] // period_ns + 1, ts[-1] // period_ns + 1, dtype=np.int64) * period_ns
+    # Periods without ticks map to the same offset as the next one
+    return np.unique(np.searchsorted(ts, edges))
+
+
+def _period_returns(ts: np.ndarray, equity: np.ndarray, period_ns: int) -> np.ndarray:
+    """Simple returns between the closing equity of consecutive periods"""
+    # Index of the last tick in each period
+    last = np.append(_period_cuts(ts, period_ns) - 1, len(ts) - 1)
+    close = equity[last]
+    return np.diff(close) / close[:-1]
+
+
+def _period_bounds(ts: np.ndarray, period_ns: int) -> np.ndarray:
+    """Start offsets of each period in ``ts``, followed by ``len(ts)``"""
+    return np.concatenate(([0], _period_cuts(ts, period_ns), [len(ts)]))
+
+
+def _annualized_ratio(returns: np.ndarray, risk_returns: np.ndarray) -> float:
+    """Mean of daily ``returns`` over the sample std of ``risk_returns``, annualized"""
+    std = _safe_std(risk_returns)
+    return _safe_mean(returns) / std * np.sqrt(TRADING_DAYS_PER_YEAR) if std > 0 else 0.0
+
+
+def daily_returns(ts: np.ndarray, equity: np.ndarray) -> np.ndarray:
+    """Simple returns between consecutive daily closing equities"""
+    return _period_returns(ts, equity, NS_PER_DAY)
+
+
+def sharpe_ratio(ts: np.ndarray, equity: np.ndarray) -> float:
+    """Annualized Sharpe ratio of daily returns (risk-free rate of zero)"""
+    daily = daily_returns(ts, equity)
+    return _annualized_ratio(daily, daily)
+
+
+def _max_run(mask: np.ndarray) -> int:
+    """Length of the longest run of True values"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return int((edges[1::2] - edges[0::2]).max()) if edges.size else 0
+
+
+def _benchmark_regression(returns: np.ndarray, benchmark: np.ndarray) -> Tuple[float, float]:
+    """Least-squares (alpha, beta) of ``returns`` on ``benchmark`` returns"""
+    if returns.size < 2:
+        return 0.0, 0.0
+    factors = np.column_stack((np.ones_like(benchmark), benchmark))
+    (alpha, beta), *_ = np.linalg.lstsq(factors, returns, rcond=None)
+    return float(alpha), float(beta)
+
+
+def compute_risk_metrics(
+    ts: np.ndarray, equity: np.ndarray, trade_pnl: np.ndarray, benchmark: np.ndarray
+) -> Dict[str, Any]:
+    """
+    Compute return and risk statistics with vectorized numpy reductions
+
+    Ratios are annualized from daily returns. VaR/CVaR are reported as
+    positive loss fractions at the 95% level. Alpha (annualized) and beta
+    come from one least-squares regression of daily returns on the
+    benchmark's daily returns.
+
+    Args:
+        ts: Tick timestamps (ns since epoch)
+        equity: Account equity at every tick
+        trade_pnl: Net PnL of each closed trade
+        benchmark: Benchmark price at every tick
+
+    Returns:
+        Dict with sharpe/sortino/max_drawdown, per-period returns and risk metrics
+    """
+    daily = daily_returns(ts, equity)
+    weekly = _period_returns(ts, equity, 7 * NS_PER_DAY)
+    benchmark_daily = daily_returns(ts, benchmark)
+    active = daily - benchmark_daily
+    alpha, beta = _benchmark_regression(daily, benchmark_daily)
+
+    if daily.size:
+        var = float(np.quantile(daily, 0.05))
+        cvar = float(daily[daily <= var].mean())
+    else:
+        var = cvar = 0.0
+
+    return {
+        "sharpe_ratio": _annualized_ratio(daily, daily),
+        "sortino_ratio": _annualized_ratio(daily, daily[daily < 0]),
+        "max_drawdown": float(_max_drawdown(equity)),
+        "daily": PeriodMetrics(avg_return=_safe_mean(daily), volatility=_safe_std(daily)),
+        "weekly": PeriodMetrics(avg_return=_safe_mean(weekly), volatility=_safe_std(weekly)),
+        "var_95": max(0.0, -var),
+        "cvar_95": max(0.0, -cvar),
+        "max_consecutive_losses": _max_run(trade_pnl <= 0),
+        "max_consecutive_wins": _max_run(trade_pnl > 0),
+        "information_ratio": _annualized_ratio(active, active),
+        "beta": beta,
+        "alpha": alpha * TRADING_DAYS_PER_YEAR,
+    }
+
+
+def run_backtest(
+    strategy: Dict[str, Any],
+    data_config: DataConfig,
+    config: BacktestConfig,
+    on_step: Optional[Callable[[int, np.ndarray, np.ndarray], None]] = None,
+    step_ns: int = NS_PER_DAY
+) -> BacktestResult:
     """
     Run backtest using NautilusTrader
 
@@ -27,107 +300,176 @@ def run_backtest(strategy: Dict[str, Any], data_config: Dict[str, Any], config:
         strategy: Strategy definition in DSL format
         data_config: Data configuration
         config: Backtest engine configuration
+        on_step: Optional callback invoked after every ``step_ns`` period as
+            ``on_step(step, ts, equity)`` with the equity curve so far. It may
+            raise to abort the backtest (e.g. optuna.TrialPruned).
+        step_ns: Reporting period for ``on_step`` (default one day)
 
     Returns:
         Backtest results with performance metrics
     """
 
     # TODO: Implement actual NautilusTrader integration
-    # This is a placeholder implementation
+    # Until then the tick loop runs in the Numba kernel (_bt_loop._simulate)
+
+    warnings: List[str] = []
+
+    # 1. Load data
+    quotes = load_quotes(data_config, warnings)
+    ts, bid, ask = quotes["ts"], quotes["bid"], quotes["ask"]
+    if len(ts) == 0:
+        raise ValueError("No quotes in requested period")
+
+    # 2. Convert DSL strategy to kernel inputs
+    sig = build_entry_signal(strategy, quotes, warnings)
+    exit_rules = strategy.get("exit", {})
+    stop = float(exit_rules.get("stopLoss", {}).get("value", 0.001))
+    tp = float(exit_rules.get("takeProfit", {}).get("value", 0.002))
+    size = float(strategy.get("riskManagement", {}).get("positionSizing", {}).get("value", 1.0))
 
-    # 1. Convert DSL strategy to Nautilus strategy
-    # nautilus_strategy = convert_dsl_to_nautilus(strategy)
+    initial_capital = config.initialCapital
+    commission = config.commission
+    slippage = config.slippage
 
-    # 2. Setup backtest engine
-    # engine = BacktestEngine(...)
+    # 3. Run backtest, one kernel call per reporting period when streaming
+    n = len(ts)
+    bounds = _period_bounds(ts, step_ns) if on_step is not None else np.array([0, n])
+    state = np.zeros(STATE_SIZE, dtype=np.float64)
+    trades = allocate_trades(n)
+    equity = np.empty(n, dtype=np.float64)
+    n_trades = 0
 
-    # 3. Load data
-    # engine.add_data(...)
+    for step, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        n_trades, unit_equity = _simulate(
+            ts[lo:hi], bid[lo:hi], ask[lo:hi], sig[lo:hi], stop, tp, commission + slippage, state, *trades)
 
-    # 4. Run backtest
-    # engine.run()
+        # 4. Apply sizing to the per-unit kernel output
+        equity[lo:hi] = initial_capital + size * unit_equity
+
+        if on_step is not None:
+            on_step(step, ts[:hi], equity[:hi])
+
+    # Closed trades only; a trailing open entry is not a trade
+    entry_ts, exit_ts, side, entry_px, exit_px, unit_pnl = (column[:n_trades] for column in trades)
+    trade_pnl = size * unit_pnl
+    holding_ns = exit_ts - entry_ts
+
+    wins = trade_pnl[trade_pnl > 0]
+    losses = trade_pnl[trade_pnl <= 0]
+    gross_loss = -losses.sum()
+    # Buy-and-hold of the traded instrument at mid is the benchmark
+    risk = compute_risk_metrics(ts, equity, trade_pnl, (bid + ask) / 2)
 
     # 5. Calculate metrics
-    # metrics = calculate_metrics(engine.get_account())
-
-    # Placeholder result
-    result = {
-        "status": "success",
-        "strategy_name": strategy.get("metadata", {}).get("name", "unknown"),
-        "period": {
-            "start": data_config["startDate"],
-            "end": data_config["endDate"],
-        },
-        "performance": {
-            "total_return": 0.15,  # 15% return
-            "sharpe_ratio": 1.8,
-            "sortino_ratio": 2.1,
-            "max_drawdown": 0.05,
-            "profit_factor": 2.3,
-            "win_rate": 0.62,
-            "total_trades": 245,
-            "winning_trades": 152,
-            "losing_trades": 93,
-            "average_win": 150.50,
-            "average_loss": -85.30,
-            "largest_win": 580.00,
-            "largest_loss": -320.00,
-        },
-        "metrics_by_period": {
-            "daily": {
-                "avg_return": 0.0012,
-                "volatility": 0.015,
-            },
-            "weekly": {
-                "avg_return": 0.0084,
-                "volatility": 0.042,
-            },
-        },
-        "risk_metrics": {
-            "var_95": 0.025,
-            "cvar_95": 0.032,
-            "max_consecutive_losses": 5,
-            "max_consecutive_wins": 8,
-        },
-        "execution_stats": {
-            "avg_slippage": 0.00015,
-            "total_commission": 245.50,
-        },
-        "warnings": [
-            "Backtest uses simulated data - results may not reflect live performance",
-        ],
-        "trade_log_summary": {
-            "first_trade": data_config["startDate"],
-            "last_trade": data_config["endDate"],
-            "avg_holding_time_seconds": 25,
-        }
-    }
+    result = BacktestResult(
+        status="success",
+        strategy_name=strategy.get("metadata", {}).get("name", "unknown"),
+        period=Period(
+            start=data_config.startDate,
+            end=data_config.endDate,
+            first_timestamp=format_ns(ts[0]),
+            last_timestamp=format_ns(ts[-1]),
+        ),
+        performance=Performance(
+            total_return=float(equity[-1] / initial_capital - 1.0),
+            sharpe_ratio=risk["sharpe_ratio"],
+            sortino_ratio=risk["sortino_ratio"],
+            max_drawdown=risk["max_drawdown"],
+            profit_factor=float(wins.sum() / gross_loss) if gross_loss > 0 else 0.0,
+            win_rate=float(len(wins) / n_trades) if n_trades else 0.0,
+            total_trades=int(n_trades),
+            winning_trades=int(len(wins)),
+            losing_trades=int(len(losses)),
+            average_win=_safe_mean(wins),
+            average_loss=_safe_mean(losses),
+            largest_win=float(wins.max()) if wins.size else 0.0,
+            largest_loss=float(losses.min()) if losses.size else 0.0,
+        ),
+        metrics_by_period=MetricsByPeriod(daily=risk["daily"], weekly=risk["weekly"]),
+        risk_metrics=RiskMetrics(
+            var_95=risk["var_95"],
+            cvar_95=risk["cvar_95"],
+            max_consecutive_losses=risk["max_consecutive_losses"],
+            max_consecutive_wins=risk["max_consecutive_wins"],
+            information_ratio=risk["information_ratio"],
+            beta=risk["beta"],
+            alpha=risk["alpha"],
+        ),
+        execution_stats=ExecStats(
+            avg_slippage=slippage,
+            total_commission=float(size * (entry_px.sum() + exit_px.sum()) * commission),
+        ),
+        warnings=warnings,
+        trade_log_summary=TradeLogSummary(
+            first_trade=format_ns(entry_ts[0]) if n_trades else None,
+            last_trade=format_ns(exit_ts[-1]) if n_trades else None,
+            avg_holding_time_seconds=_safe_mean(holding_ns) / NS_PER_SECOND,
+        ),
+    )
+
+    # Columns (not per-trade records) for downstream pandas/arrow consumers
+    if config.includeTradeLog:
+        result.trade_log = TradeLog(
+            entry_ts=entry_ts,
+            exit_ts=exit_ts,
+            side=side,
+            entry_price=entry_px,
+            exit_price=exit_px,
+            pnl=trade_pnl,
+        )
 
     return result
 
 
+# Dataclasses, numpy arrays and numpy scalars are serialized natively
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+
+
+def _error_result(e: Exception) -> Dict[str, Any]:
+    return {
+        "status": "error",
+        "error": str(e),
+        "type": type(e).__name__,
+    }
+
+
+def serve() -> None:
+    """
+    Answer newline-delimited JSON backtest requests until stdin closes
+
+    One request per input line, one result per output line, in order. The
+    interpreter, imports and compiled kernels are loaded once for the whole
+    batch. A failed request yields an error line and the loop keeps going.
+    """
+    for line in sys.stdin.buffer:
+        if not line.strip():
+            continue
+        try:
+            inp = msgspec.json.decode(line, type=BacktestInput)
+            result = run_backtest(inp.strategy, inp.dataConfig, inp.config)
+        except Exception as e:
+            result = _error_result(e)
+        sys.stdout.buffer.write(orjson.dumps(result, option=_JSON_OPTIONS))
+        sys.stdout.buffer.flush()
+
+
 def main():
-    try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
+    if "--server" in sys.argv[1:]:
+        serve()
+        return
 
-        strategy = input_data.get("strategy", {})
-        data_config = input_data.get("dataConfig", {})
-        config = input_data.get("config", {})
+    try:
+        # Read and validate input from stdin
+        inp = msgspec.json.decode(sys.stdin.buffer.read(), type=BacktestInput)
 
         # Run backtest
-        result = run_backtest(strategy, data_config, config)
+        result = run_backtest(inp.strategy, inp.dataConfig, inp.config)
 
         # Output result as JSON
-        print(json.dumps(result))
+        sys.stdout.buffer.write(orjson.dumps(result, option=_JSON_OPTIONS))
 
     except Exception as e:
-        error_result = {
-            "status": "error",
-            "error": str(e),
-            "type": type(e).__name__,
-        }
-        print(json.dumps(error_result))
+        sys.stdout.buffer.write(orjson.dumps(_error_result(e), option=_JSON_OPTIONS))
         sys.exit(1)
 
 
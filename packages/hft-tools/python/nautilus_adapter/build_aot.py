@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Ahead-of-Time Kernel Build
+
+Compiles the backtest kernels into the ``_bt_kernels`` extension module so
+CLI invocations skip Numba JIT compilation (and cache loading) entirely.
+Rebuild after changing ``_bt_loop.py`` or ``_bt_layout.py``; the backtest
+falls back to the JIT kernels when the extension is missing.
+
+Usage: python -m nautilus_adapter.build_aot
+"""
+
+import os
+import sys
+
+from numba.pycc import CC
+
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nautilus_adapter._bt_loop import MAX_DRAWDOWN_SIGNATURE, SIMULATE_SIGNATURE, _max_drawdown, _simulate
+
+
+def build() -> None:
+    cc = CC("_bt_kernels")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.target_cpu = "host"
+    cc.export("simulate", SIMULATE_SIGNATURE)(_simulate.py_func)
+    cc.export("max_drawdown", MAX_DRAWDOWN_SIGNATURE)(_max_drawdown.py_func)
+    cc.compile()
+
+
+if __name__ == "__main__":
+    build()
@@ -7,9 +7,218 @@ Input: JSON from stdin (source, instrument, dataType, dates)
 Output: JSON to stdout (data summary)
 """
 
+import errno
+import os
 import sys
-import json
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+import msgspec
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+if not __package__:
+    # Executed as a script by the MCP server (no parent package)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nautilus_adapter.schemas import FetchDataInput
+
+NS_PER_SECOND = 1_000_000_000
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Quote columns as loaded by the backtest
+QUOTE_COLUMNS = ["ts", "bid", "ask", "bid_size", "ask_size"]
+
+# Prices are stored as int64 fixed point (price * 1e8) in "<name>_e8" columns
+PRICE_COLUMNS = ("bid", "ask")
+PRICE_SCALE = 100_000_000
+
+_ROW_GROUP_SIZE = 100_000
+_GAP_NS = 60 * NS_PER_SECOND
+_MAX_REPORTED_GAPS = 100
+
+# Direct I/O: block alignment, bytes per read and reads in flight
+_DIRECT_IO_ALIGN = 4096
+_DIRECT_IO_CHUNK = 16 * 1024 * 1024
+_DIRECT_IO_DEPTH = 8
+
+# Synthetic quotes stand in until real data fetching is implemented
+_SYNTHETIC_SEED = 7
+_SYNTHETIC_MAX_TICKS = 500_000
+
+
+def parse_ns(date: str) -> int:
+    """Parse an ISO date/datetime (UTC if naive) into ns since epoch"""
+    dt = datetime.fromisoformat(date.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    # Exact integer arithmetic; dt.timestamp() is a float and drops precision
+    return (dt - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def parse_period(start_date: str, end_date: str) -> Tuple[int, int]:
+    """Parse a [start, end) date range into ns since epoch, rejecting empty or reversed ranges"""
+    start_ns = parse_ns(start_date)
+    end_ns = parse_ns(end_date)
+    if end_ns <= start_ns:
+        raise ValueError(f"endDate ({end_date}) must be after startDate ({start_date})")
+    return start_ns, end_ns
+
+
+def format_ns(ts: int) -> str:
+    """Format ns since epoch as an ISO datetime (UTC)"""
+    return datetime.fromtimestamp(ts / NS_PER_SECOND, tz=timezone.utc).isoformat()
+
+
+def simulate_quotes(start_date: str, end_date: str) -> Dict[str, np.ndarray]:
+    """
+    Generate a seeded random walk of top-of-book quotes
+
+    Args:
+        start_date: Start date (ISO format)
+        end_date: End date (ISO format)
+
+    Returns:
+        Dict of quote arrays keyed by ``QUOTE_COLUMNS``
+    """
+    start_ns, end_ns = parse_period(start_date, end_date)
+    n = int(min(max((end_ns - start_ns) // NS_PER_SECOND, 2), _SYNTHETIC_MAX_TICKS))
+    ts = start_ns + np.arange(n, dtype=np.int64) * ((end_ns - start_ns) // (n - 1))
+
+    rng = np.random.default_rng(_SYNTHETIC_SEED)
+    mid = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 1e-4, n)))
+    half_spread = mid * 5e-5
+    return {
+        "ts": ts,
+        "bid": mid - half_spread,
+        "ask": mid + half_spread,
+        "bid_size": rng.lognormal(0.0, 0.5, n) * 1000.0,
+        "ask_size": rng.lognormal(0.0, 0.5, n) * 1000.0,
+    }
+
+
+def write_quotes(quotes: Dict[str, np.ndarray], instrument: str, path: str) -> None:
+    """
+    Write quotes to a Zstd-compressed Parquet file
+
+    The instrument is stored as a dictionary-encoded column so it costs a few
+    bytes per row group rather than per row. Prices are stored as int64 fixed
+    point, the representation exchange/Nautilus prices already have.
+
+    Args:
+        quotes: Quote arrays keyed by ``QUOTE_COLUMNS``
+        instrument: Trading instrument
+        path: Output file path
+    """
+    n = len(quotes["ts"])
+    symbol = pa.DictionaryArray.from_arrays(pa.array(np.zeros(n, dtype=np.int32)), pa.array([instrument]))
+    arrays = [pa.array(quotes["ts"], type=pa.timestamp("ns", tz="UTC"))]
+    names = ["ts"]
+    for name in QUOTE_COLUMNS[1:]:
+        if name in PRICE_COLUMNS:
+            arrays.append(pa.array(np.rint(quotes[name] * PRICE_SCALE).astype(np.int64)))
+            names.append(f"{name}_e8")
+        else:
+            arrays.append(pa.array(quotes[name]))
+            names.append(name)
+    table = pa.Table.from_arrays(arrays + [symbol], names=names + ["symbol"])
+    pq.write_table(table, path, compression="zstd", use_dictionary=True, row_group_size=_ROW_GROUP_SIZE)
+
+
+def _read_direct(path: str):
+    """
+    Read a whole file with O_DIRECT, bypassing the page cache
+
+    The file is read in ``_DIRECT_IO_CHUNK`` pieces, ``_DIRECT_IO_DEPTH`` at a
+    time, into one block-aligned buffer (``os.preadv`` releases the GIL).
+
+    Args:
+        path: File path
+
+    Returns:
+        pyarrow Buffer with the file contents, or None where O_DIRECT is not
+        supported (non-Linux, tmpfs, some network filesystems)
+    """
+    if not hasattr(os, "O_DIRECT"):
+        return None
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECT)
+    except OSError as e:
+        if e.errno == errno.EINVAL:
+            return None
+        raise
+
+    try:
+        size = os.fstat(fd).st_size
+        padded = -(-size // _DIRECT_IO_ALIGN) * _DIRECT_IO_ALIGN
+        # Over-allocate, then start at the first aligned address
+        raw = np.empty(padded + _DIRECT_IO_ALIGN, dtype=np.uint8)
+        offset = -raw.ctypes.data % _DIRECT_IO_ALIGN
+        buf = raw[offset:offset + padded]
+
+        def read_chunk(start):
+            view = memoryview(buf[start:start + _DIRECT_IO_CHUNK])
+            return os.preadv(fd, [view], start)
+
+        with ThreadPoolExecutor(max_workers=_DIRECT_IO_DEPTH) as executor:
+            n_read = sum(executor.map(read_chunk, range(0, padded, _DIRECT_IO_CHUNK)))
+    except OSError as e:
+        if e.errno == errno.EINVAL:
+            return None
+        raise
+    finally:
+        os.close(fd)
+
+    if n_read != size:
+        raise OSError(errno.EIO, f"Short read ({n_read} of {size} bytes)", path)
+    return pa.py_buffer(buf[:size])
+
+
+def read_quotes(path: str, columns: List[str] = None, loader: str = "mmap") -> Dict[str, np.ndarray]:
+    """
+    Read quote columns from a Parquet file as numpy arrays
+
+    Only the requested columns are decoded and single-chunk columns are
+    converted without copying. Fixed-point prices become float64 in one
+    vectorized division per column.
+
+    Args:
+        path: Parquet file written by ``write_quotes``
+        columns: Columns to load (defaults to ``QUOTE_COLUMNS``)
+        loader: How to read the file: 'mmap' (page cache) or 'direct'
+            (O_DIRECT, for cold multi-GB files; falls back to 'mmap' where
+            unsupported)
+
+    Returns:
+        Dict of arrays keyed by column name
+    """
+    columns = columns or QUOTE_COLUMNS
+    if loader not in ("mmap", "direct"):
+        raise ValueError(f"Unknown loader: {loader}")
+
+    stored = [f"{name}_e8" if name in PRICE_COLUMNS else name for name in columns]
+    source = _read_direct(path) if loader == "direct" else None
+    if source is not None:
+        table = pq.read_table(pa.BufferReader(source), columns=stored)
+    else:
+        table = pq.read_table(path, columns=stored, memory_map=True)
+    quotes = {}
+    for name, stored_name in zip(columns, stored):
+        column = table.column(stored_name)
+        if pa.types.is_timestamp(column.type):
+            column = column.cast(pa.int64())
+        values = column.to_numpy()
+        quotes[name] = values / PRICE_SCALE if name in PRICE_COLUMNS else values
+    return quotes
+
+
+def _find_gaps(ts: np.ndarray) -> List[Dict[str, str]]:
+    """Intervals longer than ``_GAP_NS`` between consecutive quotes"""
+    idx = np.flatnonzero(np.diff(ts) > _GAP_NS)[:_MAX_REPORTED_GAPS]
+    return [{"start": format_ns(ts[i]), "end": format_ns(ts[i + 1])} for i in idx]
 
 
 def fetch_data(source: str, instrument: str, data_type: str, start_date: str, end_date: str, output_path: str = None) -> Dict[str, Any]:
@@ -22,16 +231,24 @@ def fetch_data(source: str, instrument: str, data_type: str, start_date: str, en
         data_type: Type of data (trades, orderbook, quotes, bars)
         start_date: Start date (ISO format)
         end_date: End date (ISO format)
-        output_path: Optional path to save data
+        output_path: Optional path to save data (Parquet)
 
     Returns:
         Data summary
     """
 
     # TODO: Implement actual data fetching using NautilusTrader
-    # This is a placeholder implementation
+    # Until then quotes are simulated for the requested period
+    quotes = simulate_quotes(start_date, end_date)
+    ts = quotes["ts"]
+
+    file_size_mb = 0.0
+    if output_path:
+        write_quotes(quotes, instrument, output_path)
+        file_size_mb = os.stat(output_path).st_size / (1024 * 1024)
+
+    gaps = _find_gaps(ts)
 
-    # Placeholder result
     result = {
         "status": "success",
         "source": source,
@@ -41,19 +258,22 @@ def fetch_data(source: str, instrument: str, data_type: str, start_date: str, en
             "start": start_date,
             "end": end_date,
         },
-        "records_count": 1500000,  # Example: 1.5M records
-        "file_size_mb": 250.5,
+        "records_count": len(ts),
+        "file_size_mb": round(file_size_mb, 3),
         "output_path": output_path or "memory",
         "data_quality": {
             "missing_data_points": 0,
-            "gaps": [],
-            "anomalies": 0,
+            "gaps": gaps,
+            "anomalies": int(np.count_nonzero(quotes["bid"] >= quotes["ask"])),
         },
         "summary": {
-            "first_timestamp": start_date,
-            "last_timestamp": end_date,
-            "coverage": "100%",
-        }
+            "first_timestamp": format_ns(ts[0]),
+            "last_timestamp": format_ns(ts[-1]),
+            "coverage": "100%" if not gaps else "partial",
+        },
+        "warnings": [
+            "Data is simulated - actual data fetching is not implemented yet",
+        ],
     }
 
     return result
@@ -61,21 +281,14 @@ def fetch_data(source: str, instrument: str, data_type: str, start_date: str, en
 
 def main():
     try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
-
-        source = input_data.get("source")
-        instrument = input_data.get("instrument")
-        data_type = input_data.get("dataType")
-        start_date = input_data.get("startDate")
-        end_date = input_data.get("endDate")
-        output_path = input_data.get("outputPath")
+        # Read and validate input from stdin
+        inp = msgspec.json.decode(sys.stdin.buffer.read(), type=FetchDataInput)
 
         # Fetch data
-        result = fetch_data(source, instrument, data_type, start_date, end_date, output_path)
+        result = fetch_data(inp.source, inp.instrument, inp.dataType, inp.startDate, inp.endDate, inp.outputPath)
 
         # Output result as JSON
-        print(json.dumps(result))
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
 
     except Exception as e:
         error_result = {
@@ -83,7 +296,7 @@ def main():
             "error": str(e),
             "type": type(e).__name__,
         }
-        print(json.dumps(error_result))
+        sys.stdout.buffer.write(orjson.dumps(error_result, option=orjson.OPT_APPEND_NEWLINE))
         sys.exit(1)
 
 
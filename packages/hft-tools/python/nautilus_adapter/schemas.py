@@ -0,0 +1,130 @@
+"""
+Adapter Schemas
+
+Input models are msgspec Structs, decoded and validated straight from the
+stdin bytes. Results are slotted dataclasses that orjson serializes natively.
+"""
+
+from dataclasses import dataclass
+from typing import Annotated, Any, Dict, List, Literal, Optional
+
+import msgspec
+import numpy as np
+
+
+class DataConfig(msgspec.Struct):
+    startDate: str
+    endDate: str
+    source: Optional[str] = None
+    instruments: List[str] = []
+    path: Optional[str] = None
+    loader: Literal["mmap", "direct"] = "mmap"
+
+
+class BacktestConfig(msgspec.Struct):
+    # Returns and drawdowns are fractions of capital
+    initialCapital: Annotated[float, msgspec.Meta(gt=0)] = 100000
+    commission: float = 0.001
+    slippage: float = 0.0001
+    includeTradeLog: bool = False
+
+
+class BacktestInput(msgspec.Struct, forbid_unknown_fields=True):
+    strategy: Dict[str, Any]
+    dataConfig: DataConfig
+    config: BacktestConfig = msgspec.field(default_factory=BacktestConfig)
+
+
+class FetchDataInput(msgspec.Struct, forbid_unknown_fields=True):
+    source: str
+    instrument: str
+    dataType: Literal["trades", "orderbook", "quotes", "bars"]
+    startDate: str
+    endDate: str
+    outputPath: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Period:
+    start: str
+    end: str
+    first_timestamp: str
+    last_timestamp: str
+
+
+@dataclass(slots=True)
+class Performance:
+    total_return: float
+    sharpe_ratio: float
+    sortino_ratio: float
+    max_drawdown: float
+    profit_factor: float
+    win_rate: float
+    total_trades: int
+    winning_trades: int
+    losing_trades: int
+    average_win: float
+    average_loss: float
+    largest_win: float
+    largest_loss: float
+
+
+@dataclass(slots=True)
+class PeriodMetrics:
+    avg_return: float
+    volatility: float
+
+
+@dataclass(slots=True)
+class MetricsByPeriod:
+    daily: PeriodMetrics
+    weekly: PeriodMetrics
+
+
+@dataclass(slots=True)
+class RiskMetrics:
+    var_95: float
+    cvar_95: float
+    max_consecutive_losses: int
+    max_consecutive_wins: int
+    information_ratio: float
+    beta: float
+    alpha: float
+
+
+@dataclass(slots=True)
+class ExecStats:
+    avg_slippage: float
+    total_commission: float
+
+
+@dataclass(slots=True)
+class TradeLogSummary:
+    first_trade: Optional[str]
+    last_trade: Optional[str]
+    avg_holding_time_seconds: float
+
+
+@dataclass(slots=True)
+class TradeLog:
+    """Closed trades as columns (one array per field)"""
+    entry_ts: np.ndarray
+    exit_ts: np.ndarray
+    side: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    pnl: np.ndarray
+
+
+@dataclass(slots=True)
+class BacktestResult:
+    status: str
+    strategy_name: str
+    period: Period
+    performance: Performance
+    metrics_by_period: MetricsByPeriod
+    risk_metrics: RiskMetrics
+    execution_stats: ExecStats
+    warnings: List[str]
+    trade_log_summary: TradeLogSummary
+    trade_log: Optional[TradeLog] = None
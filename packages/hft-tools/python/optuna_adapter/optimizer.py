@@ -7,12 +7,264 @@ Input: JSON from stdin (strategy, searchSpace, nTrials, etc.)
 Output: JSON to stdout (best parameters, optimization history)
 """
 
+import copy
+import os
+import re
 import sys
-import json
-from typing import Any, Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List
 
+import msgspec
+import numpy as np
+import optuna
+import orjson
 
-def create_objective_function(base_strategy: Dict[str, Any], search_space: Dict[str, Any], backtest_config: Dict[str, Any]):
+if not __package__:
+    # Executed as a script by the MCP server (no parent package)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nautilus_adapter.backtest import TRADING_DAYS_PER_YEAR, daily_returns, run_backtest, sharpe_ratio
+from nautilus_adapter.schemas import BacktestResult
+from optuna_adapter.schemas import OptimizeInput, TrialBacktestConfig
+
+# Studies are persisted so repeated CLI calls keep building on the same history
+STUDY_DIR = os.environ.get("HFT_STUDY_DIR", "./studies")
+DEFAULT_STUDY_NAME = "unnamed_study"
+# Study names become file names in STUDY_DIR
+_STUDY_NAME = re.compile(r"[\w.-]+")
+
+# Daily returns needed before the running Sharpe ratio is reported to the
+# pruner; with fewer it is 0.0 or dominated by a near-zero std
+PRUNING_WARMUP_DAYS = 5
+
+# Bootstrap resampling for Sharpe ratio confidence intervals (PCG64). Each
+# trial seeds its own generator from (seed, trial number), so intervals are
+# reproducible and independent of which worker ran the trial.
+BOOTSTRAP_SAMPLES = 1000
+BOOTSTRAP_SEED = int(os.environ.get("HFT_BOOTSTRAP_SEED", 0))
+
+
+def get_storage(study_name: str, create: bool = True) -> optuna.storages.JournalStorage:
+    """
+    Get the journal storage backing a study
+
+    A journal file (rather than SQLite) is used because it supports safe
+    concurrent writes from multiple worker processes.
+
+    Args:
+        study_name: Study name (letters, digits, '_', '-' and '.')
+        create: Create the journal if the study does not exist yet
+
+    Returns:
+        Optuna storage
+    """
+    if not _STUDY_NAME.fullmatch(study_name) or not study_name.strip("."):
+        raise ValueError(f"Invalid study name: {study_name!r}")
+    path = os.path.join(STUDY_DIR, f"{study_name}.log")
+    if not create and not os.path.exists(path):
+        raise ValueError(f"Study not found: {study_name}")
+    os.makedirs(STUDY_DIR, exist_ok=True)
+    return optuna.storages.JournalStorage(optuna.storages.journal.JournalFileBackend(path))
+
+
+def create_sampler(sampler: str, search_space: Dict[str, Any]) -> optuna.samplers.BaseSampler:
+    """Resolve a sampler name to an Optuna sampler"""
+    if sampler == 'TPE':
+        # constant_liar makes running (parallel) trials steer new suggestions
+        return optuna.samplers.TPESampler(constant_liar=True)
+    if sampler == 'Random':
+        return optuna.samplers.RandomSampler()
+    if sampler == 'CmaEs':
+        return optuna.samplers.CmaEsSampler()
+    if sampler == 'Grid':
+        grid = {}
+        for param_name, param_range in search_space.get('searchSpace', {}).items():
+            if param_range['type'] == 'categorical':
+                grid[param_name] = param_range['choices']
+            elif 'step' in param_range:
+                n_steps = int(round((param_range['high'] - param_range['low']) / param_range['step']))
+                grid[param_name] = [param_range['low'] + i * param_range['step'] for i in range(n_steps + 1)]
+            else:
+                raise ValueError(f"Grid sampler requires 'step' or 'choices' for parameter: {param_name}")
+        return optuna.samplers.GridSampler(grid)
+    raise ValueError(f"Unknown sampler: {sampler}")
+
+
+def create_pruner(pruner: str) -> optuna.pruners.BasePruner:
+    """Resolve a pruner name to an Optuna pruner"""
+    if pruner == 'ASHA':
+        # Asynchronous successive halving: no rung synchronization, so it
+        # keeps pruning while trials finish out of order across workers
+        return optuna.pruners.SuccessiveHalvingPruner(
+            min_resource=PRUNING_WARMUP_DAYS, reduction_factor=3, min_early_stopping_rate=0)
+    if pruner == 'Hyperband':
+        return optuna.pruners.HyperbandPruner(min_resource=PRUNING_WARMUP_DAYS)
+    if pruner == 'Median':
+        return optuna.pruners.MedianPruner()
+    if pruner == 'None':
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"Unknown pruner: {pruner}")
+
+
+def _suggest_call(index: int, param_range: Dict[str, Any]) -> str:
+    """Source for the ``trial.suggest_*`` call sampling one parameter"""
+    name = f"param_names[{index}]"
+    if param_range['type'] == 'int':
+        return (f"trial.suggest_int({name}, {param_range['low']!r}, {param_range['high']!r}, "
+                f"step={param_range.get('step', 1)!r}, log={param_range.get('log', False)!r})")
+    if param_range['type'] == 'float':
+        return (f"trial.suggest_float({name}, {param_range['low']!r}, {param_range['high']!r}, "
+                f"step={param_range.get('step')!r}, log={param_range.get('log', False)!r})")
+    if param_range['type'] == 'categorical':
+        return f"trial.suggest_categorical({name}, choices[{index}])"
+    return None
+
+
+# Generated samplers, keyed by the search space they were built from
+_SUGGEST_CACHE: Dict[bytes, Callable[[optuna.Trial], Dict[str, Any]]] = {}
+
+
+def compile_suggest(search_space: Dict[str, Any]) -> Callable[[optuna.Trial], Dict[str, Any]]:
+    """
+    Build a function that samples one value per parameter in the search space
+
+    The parameter names and ranges are fixed for the lifetime of a study, so
+    they are parsed once into straight-line source (one ``trial.suggest_*``
+    call per parameter, bounds inlined as literals) instead of being
+    re-interpreted on every trial.
+
+    Args:
+        search_space: Parameter search space
+
+    Returns:
+        Function mapping a trial to its sampled parameters
+    """
+    key = orjson.dumps(search_space.get('searchSpace', {}), option=orjson.OPT_SORT_KEYS)
+    suggest = _SUGGEST_CACHE.get(key)
+    if suggest is not None:
+        return suggest
+
+    param_names = []
+    choices = []
+    lines = []
+    for param_name, param_range in search_space.get('searchSpace', {}).items():
+        call = _suggest_call(len(param_names), param_range)
+        if call is None:
+            continue
+        lines.append(f"        param_names[{len(param_names)}]: {call},")
+        param_names.append(param_name)
+        choices.append(param_range.get('choices'))
+
+    source = "def suggest(trial):\n    return {\n" + "\n".join(lines) + "\n    }\n"
+    namespace = {"param_names": tuple(param_names), "choices": tuple(choices)}
+    exec(compile(source, "<suggest>", "exec"), namespace)
+
+    suggest = _SUGGEST_CACHE[key] = namespace["suggest"]
+    return suggest
+
+
+def update_strategy_params(strategy: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply sampled parameters to a copy of the strategy
+
+    Parameter names are dotted paths into the DSL. List elements are selected
+    by their ``id``, e.g. ``signals.ofi_signal.params.windowSize``.
+
+    Args:
+        strategy: Base strategy definition
+        params: Parameter values keyed by dotted path
+
+    Returns:
+        Updated strategy
+    """
+    updated = copy.deepcopy(strategy)
+    for path, value in params.items():
+        *parents, leaf = path.split('.')
+        node = updated
+        for key in parents:
+            if isinstance(node, list):
+                matches = [item for item in node if item.get('id') == key]
+                if not matches:
+                    raise ValueError(f"No element with id '{key}' for parameter: {path}")
+                node = matches[0]
+            else:
+                node = node.setdefault(key, {})
+        node[leaf] = value
+    return updated
+
+
+def objective_value(backtest_result: BacktestResult, metric: str) -> float:
+    """Extract the objective metric from a backtest result"""
+    performance = backtest_result.performance
+    if metric == 'risk_adjusted_return':
+        max_drawdown = performance.max_drawdown
+        return performance.total_return / max_drawdown if max_drawdown > 0 else 0.0
+    return getattr(performance, metric)
+
+
+def bootstrap_sharpe_ci(
+    returns: np.ndarray, rng: np.random.Generator, n_boot: int = BOOTSTRAP_SAMPLES, alpha: float = 0.05
+) -> List[float]:
+    """
+    Bootstrap confidence interval of the annualized Sharpe ratio
+
+    All resamples are drawn in one (n_boot, n) allocation and reduced row-wise.
+
+    Args:
+        returns: Daily returns
+        rng: Generator to draw the resamples from
+        n_boot: Number of bootstrap resamples
+        alpha: Two-sided significance level
+
+    Returns:
+        [lower, upper] bounds, or [0.0, 0.0] with fewer than two returns
+    """
+    if returns.size < 2:
+        return [0.0, 0.0]
+    samples = rng.choice(returns, size=(n_boot, returns.size), replace=True)
+    std = samples.std(axis=1, ddof=1)
+    sharpe = np.divide(samples.mean(axis=1), std, out=np.zeros(n_boot), where=std > 0) * np.sqrt(TRADING_DAYS_PER_YEAR)
+    lower, upper = np.quantile(sharpe, [alpha / 2, 1 - alpha / 2])
+    return [float(lower), float(upper)]
+
+
+def _step_callback(trial: optuna.Trial, prune: bool, final: Dict[str, np.ndarray]):
+    """
+    Backtest step callback
+
+    Keeps the latest equity curve in ``final`` and, when ``prune`` is set,
+    reports the running Sharpe ratio to the pruner once step covers
+    ``PRUNING_WARMUP_DAYS`` daily returns.
+    """
+
+    def on_step(step, ts, equity):
+        final["ts"], final["equity"] = ts, equity
+        # Step s has s + 1 daily closes, so s daily returns
+        if prune and step >= PRUNING_WARMUP_DAYS:
+            trial.report(sharpe_ratio(ts, equity), step=step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+
+    return on_step
+
+
+def _run_bt(strategy: Dict[str, Any], backtest_config: TrialBacktestConfig, metric: str, trial: optuna.Trial) -> float:
+    """
+    Run one backtest and return its objective value
+
+    Intermediate daily values are reported on ``trial`` for pruning when the
+    objective is the Sharpe ratio (the only metric streamed by the backtest).
+    The trial also records a bootstrap confidence interval of its Sharpe ratio.
+    """
+    final = {}
+    on_step = _step_callback(trial, metric == 'sharpe_ratio', final)
+    backtest_result = run_backtest(strategy, backtest_config, backtest_config.config, on_step=on_step)
+    rng = np.random.default_rng([BOOTSTRAP_SEED, trial.number])
+    trial.set_user_attr("sharpe_ci_95", bootstrap_sharpe_ci(daily_returns(final["ts"], final["equity"]), rng))
+    return objective_value(backtest_result, metric)
+
+
+def create_objective_function(base_strategy: Dict[str, Any], search_space: Dict[str, Any], backtest_config: TrialBacktestConfig):
     """
     Create Optuna objective function
 
@@ -21,47 +273,164 @@ def create_objective_function(base_strategy: Dict[str, Any], search_space: Dict[
     2. Update strategy with sampled parameters
     3. Run backtest
     4. Return objective metric value
+
+    A failing trial keeps its error as the ``fail_reason`` user attribute.
     """
 
+    metric = search_space.get('objective', {}).get('metric', 'sharpe_ratio')
+    suggest = compile_suggest(search_space)
+
     def objective(trial):
-        # TODO: Implement actual Optuna integration
-        # This is a placeholder implementation
+        try:
+            updated_strategy = update_strategy_params(base_strategy, suggest(trial))
+            return _run_bt(updated_strategy, backtest_config, metric, trial)
+        except optuna.TrialPruned:
+            raise
+        except Exception as e:
+            trial.set_user_attr("fail_reason", f"{type(e).__name__}: {e}")
+            raise
 
-        # 1. Sample parameters
-        # params = {}
-        # for param_name, param_range in search_space['searchSpace'].items():
-        #     if param_range['type'] == 'int':
-        #         params[param_name] = trial.suggest_int(...)
-        #     elif param_range['type'] == 'float':
-        #         params[param_name] = trial.suggest_float(...)
-        #     elif param_range['type'] == 'categorical':
-        #         params[param_name] = trial.suggest_categorical(...)
+    return objective
 
-        # 2. Update strategy with params
-        # updated_strategy = update_strategy_params(base_strategy, params)
 
-        # 3. Run backtest
-        # backtest_result = run_backtest(updated_strategy, backtest_config)
+def _optimize_worker(
+    study_name: str,
+    strategy: Dict[str, Any],
+    search_space: Dict[str, Any],
+    backtest_config: TrialBacktestConfig,
+    n_trials: int,
+    sampler: str,
+    pruner: str
+) -> None:
+    """Worker process entry point: run trials against the shared study storage"""
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=get_storage(study_name),
+        sampler=create_sampler(sampler, search_space),
+        pruner=create_pruner(pruner),
+    )
+    study.optimize(
+        create_objective_function(strategy, search_space, backtest_config), n_trials=n_trials, catch=(Exception,))
 
-        # 4. Return objective metric
-        # metric = search_space['objective']['metric']
-        # return backtest_result['performance'][metric]
 
-        # Placeholder: return random value
-        import random
-        return random.uniform(1.0, 2.5)
+def run_trials(
+    study: optuna.Study,
+    strategy: Dict[str, Any],
+    search_space: Dict[str, Any],
+    backtest_config: TrialBacktestConfig,
+    n_trials: int,
+    n_workers: int = None,
+    sampler: str = 'TPE',
+    pruner: str = 'ASHA'
+) -> None:
+    """
+    Evaluate trials, running backtests in parallel worker processes
 
-    return objective
+    Each worker loads the study from its journal storage and runs its share
+    of the trials with ``study.optimize`` (Optuna's distributed
+    optimization pattern). Samplers read every worker's trials from the
+    shared storage, and intermediate values are reported there, so pruning
+    works across workers.
+
+    In both the serial and parallel paths a failing backtest is recorded as
+    a FAIL trial rather than aborting the run; see ``check_trials``.
+
+    Args:
+        study: Study to add trials to
+        strategy: Base strategy definition
+        search_space: Parameter search space
+        backtest_config: Backtest configuration
+        n_trials: Number of trials
+        n_workers: Worker processes (defaults to the CPU count)
+        sampler: Sampler name used by the workers (must match the study's)
+        pruner: Pruner name used by the workers (must match the study's)
+    """
+    n_workers = min(n_workers or os.cpu_count() or 1, n_trials)
+    if n_workers <= 1:
+        study.optimize(
+            create_objective_function(strategy, search_space, backtest_config), n_trials=n_trials, catch=(Exception,))
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(
+                _optimize_worker, study.study_name, strategy, search_space, backtest_config,
+                n_trials // n_workers + (i < n_trials % n_workers), sampler, pruner)
+            for i in range(n_workers)
+        ]
+        for future in futures:
+            future.result()
+
+
+def check_trials(study: optuna.Study, first_trial: int) -> None:
+    """
+    Fail the run if none of its trials completed because backtests failed
+
+    Args:
+        study: Study the trials were added to
+        first_trial: Number of the first trial of this run
+
+    Raises:
+        RuntimeError: With the first failure's reason
+    """
+    trials = [t for t in study.get_trials(deepcopy=False) if t.number >= first_trial]
+    failed = [t for t in trials if t.state == optuna.trial.TrialState.FAIL]
+    if failed and not any(t.state == optuna.trial.TrialState.COMPLETE for t in trials):
+        first = min(failed, key=lambda t: t.number)
+        reason = first.user_attrs.get("fail_reason", "unknown error")
+        raise RuntimeError(f"{len(failed)} of {len(trials)} trials failed, none completed. Trial {first.number}: {reason}")
+
+
+def summarize_study(study: optuna.Study) -> Dict[str, Any]:
+    """
+    Summarize a study's trials for the JSON result
+
+    Args:
+        study: Optuna study
+
+    Returns:
+        Best trial, history, importances and trial statistics
+    """
+    trials = study.get_trials(deepcopy=False)
+    complete = [t for t in trials if t.state == optuna.trial.TrialState.COMPLETE]
+    pruned = [t for t in trials if t.state == optuna.trial.TrialState.PRUNED]
+    failed = [t for t in trials if t.state == optuna.trial.TrialState.FAIL]
+
+    try:
+        param_importances = optuna.importance.get_param_importances(study)
+    except (ValueError, RuntimeError):
+        # Needs at least two complete trials with varying parameters
+        param_importances = {}
+
+    best_trial = study.best_trial if complete else None
+    return {
+        "best_params": best_trial.params if best_trial else {},
+        "best_value": best_trial.value if best_trial else None,
+        "best_sharpe_ci_95": best_trial.user_attrs.get("sharpe_ci_95") if best_trial else None,
+        "optimization_history": [
+            {"trial": t.number, "value": t.value, "params": t.params}
+            for t in complete
+        ],
+        "param_importances": param_importances,
+        "statistics": {
+            "total_trials": len(trials),
+            "complete_trials": len(complete),
+            "pruned_trials": len(pruned),
+            "failed_trials": len(failed),
+            "best_trial_number": best_trial.number if best_trial else None,
+        }
+    }
 
 
 def optimize(
     strategy: Dict[str, Any],
     search_space: Dict[str, Any],
+    backtest_config: TrialBacktestConfig,
     n_trials: int,
     study_name: str = None,
     sampler: str = 'TPE',
-    pruner: str = 'Hyperband',
-    backtest_config: Dict[str, Any] = None
+    pruner: str = 'ASHA',
+    n_workers: int = None
 ) -> Dict[str, Any]:
     """
     Run optimization using Optuna
@@ -69,53 +438,46 @@ def optimize(
     Args:
         strategy: Base strategy definition
         search_space: Parameter search space
+        backtest_config: Backtest configuration
         n_trials: Number of trials
         study_name: Study name for persistence
         sampler: Sampling algorithm
         pruner: Pruning algorithm
-        backtest_config: Backtest configuration
+        n_workers: Parallel backtest processes (defaults to the CPU count)
 
     Returns:
         Optimization results
     """
 
-    # TODO: Implement actual Optuna integration
-    # import optuna
-    # study = optuna.create_study(...)
-    # study.optimize(objective, n_trials=n_trials)
+    study_name = study_name or DEFAULT_STUDY_NAME
+
+    study = optuna.create_study(
+        study_name=study_name,
+        storage=get_storage(study_name),
+        sampler=create_sampler(sampler, search_space),
+        pruner=create_pruner(pruner),
+        direction=search_space.get('objective', {}).get('direction', 'maximize'),
+        load_if_exists=True,
+    )
+
+    # Keep everything needed to rebuild the objective in study.py
+    study.set_user_attr("strategy", strategy)
+    study.set_user_attr("search_space", search_space)
+    study.set_user_attr("backtest_config", msgspec.to_builtins(backtest_config))
+    study.set_user_attr("sampler", sampler)
+    study.set_user_attr("pruner", pruner)
+
+    first_trial = len(study.get_trials(deepcopy=False))
+    run_trials(study, strategy, search_space, backtest_config, n_trials, n_workers, sampler, pruner)
+    check_trials(study, first_trial)
 
-    # Placeholder result
     result = {
         "status": "success",
-        "study_name": study_name or "unnamed_study",
+        "study_name": study_name,
         "n_trials": n_trials,
         "sampler": sampler,
         "pruner": pruner,
-        "best_params": {
-            "signals.ofi_signal.params.windowSize": 15,
-            "signals.ofi_signal.params.threshold": 0.35,
-            "exit.stopLoss.value": 0.0012,
-            "exit.takeProfit.value": 0.0025,
-        },
-        "best_value": 2.15,  # Best Sharpe ratio
-        "optimization_history": [
-            {"trial": 0, "value": 1.2, "params": {"windowSize": 10, "threshold": 0.3}},
-            {"trial": 1, "value": 1.5, "params": {"windowSize": 12, "threshold": 0.32}},
-            {"trial": 2, "value": 1.8, "params": {"windowSize": 15, "threshold": 0.35}},
-            {"trial": 3, "value": 2.15, "params": {"windowSize": 15, "threshold": 0.35}},
-        ],
-        "param_importances": {
-            "signals.ofi_signal.params.threshold": 0.45,
-            "exit.takeProfit.value": 0.30,
-            "signals.ofi_signal.params.windowSize": 0.15,
-            "exit.stopLoss.value": 0.10,
-        },
-        "statistics": {
-            "total_trials": n_trials,
-            "complete_trials": n_trials,
-            "pruned_trials": 0,
-            "best_trial_number": 3,
-        }
+        **summarize_study(study),
     }
 
     return result
@@ -123,22 +485,16 @@ def optimize(
 
 def main():
     try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
-
-        strategy = input_data.get("strategy", {})
-        search_space = input_data.get("searchSpace", {})
-        n_trials = input_data.get("nTrials", 100)
-        study_name = input_data.get("studyName")
-        sampler = input_data.get("sampler", "TPE")
-        pruner = input_data.get("pruner", "Hyperband")
-        backtest_config = input_data.get("backtestConfig", {})
+        # Read and validate input from stdin
+        inp = msgspec.json.decode(sys.stdin.buffer.read(), type=OptimizeInput)
 
         # Run optimization
-        result = optimize(strategy, search_space, n_trials, study_name, sampler, pruner, backtest_config)
+        result = optimize(
+            inp.strategy, inp.searchSpace, inp.backtestConfig, inp.nTrials, inp.studyName, inp.sampler, inp.pruner,
+            inp.nWorkers)
 
         # Output result as JSON
-        print(json.dumps(result))
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
 
     except Exception as e:
         error_result = {
@@ -146,7 +502,7 @@ def main():
             "error": str(e),
             "type": type(e).__name__,
         }
-        print(json.dumps(error_result))
+        sys.stdout.buffer.write(orjson.dumps(error_result, option=orjson.OPT_APPEND_NEWLINE))
         sys.exit(1)
 
 
@@ -0,0 +1,35 @@
+"""
+Optuna Adapter Schemas
+
+Input models (msgspec Structs), decoded and validated straight from the
+stdin bytes.
+"""
+
+from typing import Any, Dict, Literal, Optional
+
+import msgspec
+
+from nautilus_adapter.schemas import BacktestConfig, DataConfig
+
+
+class TrialBacktestConfig(DataConfig):
+    """Data configuration for objective backtests, with optional engine settings"""
+    config: BacktestConfig = msgspec.field(default_factory=BacktestConfig)
+
+
+class OptimizeInput(msgspec.Struct, forbid_unknown_fields=True):
+    strategy: Dict[str, Any]
+    searchSpace: Dict[str, Any]
+    backtestConfig: TrialBacktestConfig
+    nTrials: int = 100
+    studyName: Optional[str] = None
+    sampler: Literal["TPE", "Random", "Grid", "CmaEs"] = "TPE"
+    pruner: Literal["ASHA", "Hyperband", "Median", "None"] = "ASHA"
+    nWorkers: Optional[int] = None
+
+
+class StudyInput(msgspec.Struct, forbid_unknown_fields=True):
+    studyName: str
+    action: str = "continue"
+    nTrials: int = 50
+    nWorkers: Optional[int] = None
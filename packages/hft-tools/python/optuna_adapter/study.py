@@ -5,36 +5,75 @@ Optuna Study Management
 Manage existing Optuna studies.
 """
 
+import os
 import sys
-import json
 from typing import Any, Dict
 
+import msgspec
+import optuna
+import orjson
 
-def continue_study(study_name: str, n_trials: int) -> Dict[str, Any]:
+if not __package__:
+    # Executed as a script by the MCP server (no parent package)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from optuna_adapter.optimizer import check_trials, create_pruner, create_sampler, get_storage, run_trials
+from optuna_adapter.schemas import StudyInput, TrialBacktestConfig
+
+
+def _best_value(study: optuna.Study):
+    """Best objective value so far, or None if no trial has completed"""
+    try:
+        return study.best_value
+    except ValueError:
+        return None
+
+
+def continue_study(study_name: str, n_trials: int, n_workers: int = None) -> Dict[str, Any]:
     """
     Continue an existing study
 
     Args:
         study_name: Name of the study
         n_trials: Number of additional trials
+        n_workers: Parallel backtest processes (defaults to the CPU count)
 
     Returns:
         Updated study information
     """
 
-    # TODO: Implement actual Optuna study continuation
-    # import optuna
-    # study = optuna.load_study(study_name=study_name, ...)
-    # study.optimize(objective, n_trials=n_trials)
+    storage = get_storage(study_name, create=False)
+    study = optuna.load_study(study_name=study_name, storage=storage)
+
+    # The objective inputs were stored on the study by optimizer.optimize
+    attrs = study.user_attrs
+    search_space = attrs.get("search_space", {})
+    sampler = attrs.get("sampler", "TPE")
+    pruner = attrs.get("pruner", "ASHA")
+    study.sampler = create_sampler(sampler, search_space)
+    study.pruner = create_pruner(pruner)
+
+    previous_best = _best_value(study)
+    first_trial = len(study.trials)
+    backtest_config = msgspec.convert(attrs.get("backtest_config", {}), TrialBacktestConfig)
+    run_trials(study, attrs.get("strategy", {}), search_space, backtest_config, n_trials, n_workers, sampler, pruner)
+    check_trials(study, first_trial)
+    best_value = _best_value(study)
+
+    if previous_best is None or best_value is None:
+        improved = best_value is not None
+    elif study.direction == optuna.study.StudyDirection.MINIMIZE:
+        improved = best_value < previous_best
+    else:
+        improved = best_value > previous_best
 
-    # Placeholder result
     result = {
         "status": "success",
         "study_name": study_name,
         "trials_added": n_trials,
-        "total_trials": 150,  # Example
-        "best_value": 2.25,
-        "improved": True,
+        "total_trials": len(study.trials),
+        "best_value": best_value,
+        "improved": improved,
         "message": f"Added {n_trials} trials to study '{study_name}'",
     }
 
@@ -43,21 +82,17 @@ def continue_study(study_name: str, n_trials: int) -> Dict[str, Any]:
 
 def main():
     try:
-        input_data = json.loads(sys.stdin.read())
-
-        action = input_data.get("action", "continue")
-        study_name = input_data.get("studyName")
-        n_trials = input_data.get("nTrials", 50)
+        inp = msgspec.json.decode(sys.stdin.buffer.read(), type=StudyInput)
 
-        if action == "continue":
-            result = continue_study(study_name, n_trials)
+        if inp.action == "continue":
+            result = continue_study(inp.studyName, inp.nTrials, inp.nWorkers)
         else:
             result = {
                 "status": "error",
-                "error": f"Unknown action: {action}",
+                "error": f"Unknown action: {inp.action}",
             }
 
-        print(json.dumps(result))
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
 
     except Exception as e:
         error_result = {
@@ -65,7 +100,7 @@ def main():
             "error": str(e),
             "type": type(e).__name__,
         }
-        print(json.dumps(error_result))
+        sys.stdout.buffer.write(orjson.dumps(error_result, option=orjson.OPT_APPEND_NEWLINE))
         sys.exit(1)
 
 
@@ -10,17 +10,17 @@ import type { Strategy, SearchSpace } from '../dsl/schema.js';
 export interface TunerConfig extends AgentConfig {
   nTrials?: number;
   sampler?: 'TPE' | 'Random' | 'Grid' | 'CmaEs';
-  pruner?: 'Hyperband' | 'Median' | 'None';
+  pruner?: 'ASHA' | 'Hyperband' | 'Median' | 'None';
   studyName?: string;
 }
 
 export interface TunerInput {
   strategy: Strategy;
   searchSpace: SearchSpace;
-  backtestConfig?: {
+  backtestConfig: {
     source?: string;
-    startDate?: string;
-    endDate?: string;
+    startDate: string;
+    endDate: string;
   };
 }
 
@@ -50,7 +50,7 @@ export class TunerAgent extends BaseAgent {
     this.tunerConfig = {
       nTrials: 100,
       sampler: 'TPE',
-      pruner: 'Hyperband',
+      pruner: 'ASHA',
       ...config,
     };
   }
@@ -64,6 +64,10 @@ export class TunerAgent extends BaseAgent {
       this.log('Search space is required', 'error');
       return false;
     }
+    if (!input.backtestConfig) {
+      this.log('Backtest config is required', 'error');
+      return false;
+    }
     return true;
   }
 
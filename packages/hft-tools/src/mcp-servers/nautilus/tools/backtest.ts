@@ -43,6 +43,16 @@ export const backtestTool: Tool & { handler: (args: any) => Promise<any> } = {
             type: 'string',
             description: 'End date (ISO format)',
           },
+          path: {
+            type: 'string',
+            description: 'Parquet file saved by nautilus_get_data (simulated data if omitted)',
+          },
+          loader: {
+            type: 'string',
+            enum: ['mmap', 'direct'],
+            description: 'File loader ("direct" uses O_DIRECT for cold multi-GB files)',
+            default: 'mmap',
+          },
         },
         required: ['source', 'instruments', 'startDate', 'endDate'],
       },
@@ -65,6 +75,11 @@ export const backtestTool: Tool & { handler: (args: any) => Promise<any> } = {
             description: 'Slippage model parameter',
             default: 0.0001,
           },
+          includeTradeLog: {
+            type: 'boolean',
+            description: 'Include the per-trade log (as columns) in the result',
+            default: false,
+          },
         },
       },
     },
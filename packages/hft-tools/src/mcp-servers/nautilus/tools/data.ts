@@ -39,7 +39,7 @@ export const getDataTool: Tool & { handler: (args: any) => Promise<any> } = {
       },
       outputPath: {
         type: 'string',
-        description: 'Path to save the data (optional)',
+        description: 'Path to save the data as Parquet (optional)',
       },
     },
     required: ['source', 'instrument', 'dataType', 'startDate', 'endDate'],
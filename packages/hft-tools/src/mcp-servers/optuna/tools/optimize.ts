@@ -41,16 +41,27 @@ export const optimizeTool: Tool & { handler: (args: any) => Promise<any> } = {
       },
       pruner: {
         type: 'string',
-        enum: ['Hyperband', 'Median', 'None'],
+        enum: ['ASHA', 'Hyperband', 'Median', 'None'],
         description: 'Pruning algorithm',
-        default: 'Hyperband',
+        default: 'ASHA',
       },
       backtestConfig: {
         type: 'object',
         description: 'Backtest configuration for objective evaluation',
+        properties: {
+          startDate: {
+            type: 'string',
+            description: 'Start date (ISO format)',
+          },
+          endDate: {
+            type: 'string',
+            description: 'End date (ISO format)',
+          },
+        },
+        required: ['startDate', 'endDate'],
       },
     },
-    required: ['strategy', 'searchSpace'],
+    required: ['strategy', 'searchSpace', 'backtestConfig'],
   },
 
   async handler(args: any) {
@@ -60,7 +71,7 @@ export const optimizeTool: Tool & { handler: (args: any) => Promise<any> } = {
       nTrials = 100,
       studyName,
       sampler = 'TPE',
-      pruner = 'Hyperband',
+      pruner = 'ASHA',
       backtestConfig,
     } = args;
 